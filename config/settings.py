@@ -63,6 +63,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'supply_chain.context_processors.live_updates',
             ],
         },
     },
@@ -118,6 +119,25 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Import jobs
+# Rejected rows of each import_data run are written here as job_<id>_quarantine.csv
+
+IMPORT_QUARANTINE_DIR = BASE_DIR / 'data' / 'import_jobs'
+
+# Orders older than this many days (counted back from the newest order) are moved
+# to the archive table by the archive_orders command
+
+ORDER_ARCHIVE_DAYS = 365
+
+# Live updates
+# How often the change feed checks for new order events, per server process
+
+CHANGE_FEED_POLL_SECONDS = 1
+
+# Order events older than this are deleted by prune_order_events, which import_data also runs
+
+CHANGE_FEED_RETENTION_HOURS = 24
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
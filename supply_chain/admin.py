@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Supplier, Product
+from .models import Supplier, Product, ImportJob
 
 # Registered models here.
 admin.site.register(Supplier)
-admin.site.register(Product)
\ No newline at end of file
+admin.site.register(Product)
+admin.site.register(ImportJob)
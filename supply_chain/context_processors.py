@@ -0,0 +1,12 @@
+from django.core.handlers.asgi import ASGIRequest
+
+from .events import latest_event_id
+
+
+def live_updates(request):
+    # the event stream needs an ASGI server, under WSGI it would hold a worker thread forever
+    if not isinstance(request, ASGIRequest):
+        return {'live_updates': False}
+
+    # the page shows the data as of this event, the stream picks up right after it
+    return {'live_updates': True, 'live_event_id': latest_event_id()}
@@ -0,0 +1,146 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Product, Supplier, Order, OrderEvent
+
+
+def current_counts():
+    # totals shown by the dashboard KPI cards and the kanban column headers
+    status_counts = dict.fromkeys(['pending', 'in_progress', 'shipped', 'delivered'], 0)
+    status_counts.update(Order.objects.values_list('status').annotate(count=Count('id')).order_by())
+
+    return {
+        'product_count': Product.objects.count(),
+        'supplier_count': Supplier.objects.count(),
+        'category_count': Product.objects.values('category').distinct().count(),
+        'status_counts': status_counts,
+    }
+
+
+def record_status_change(order, old_status):
+    OrderEvent.objects.create(
+        kind='status',
+        order_id=order.order_id,
+        old_status=old_status,
+        new_status=order.status,
+    )
+
+
+def record_import():
+    OrderEvent.objects.create(kind='import', payload=current_counts())
+
+
+EVENT_BATCH_SIZE = 500
+
+
+def prune_events(hours=None):
+    # replay only needs recent events, a client gone for longer reloads the page anyway
+    hours = settings.CHANGE_FEED_RETENTION_HOURS if hours is None else hours
+    deleted, _ = OrderEvent.objects.filter(created_at__lt=timezone.now() - timedelta(hours=hours)).delete()
+    return deleted
+
+
+def events_after(event_id, limit=EVENT_BATCH_SIZE):
+    return list(OrderEvent.objects.filter(pk__gt=event_id).order_by('pk')[:limit])
+
+
+def latest_event_id():
+    return OrderEvent.objects.aggregate(latest=Max('pk'))['latest'] or 0
+
+
+def format_event(event):
+    return f"id: {event.pk}\nevent: {event.kind}\ndata: {json.dumps(event.as_message())}\n\n"
+
+
+class ChangeFeed:
+    """
+    Fans OrderEvent rows out to every connected stream of this process.
+
+    A single task polls the table and pushes new events into one queue per
+    client, so the database sees one small query per poll interval no matter
+    how many boards are open.
+    """
+
+    def __init__(self, poll_seconds, queue_size=1000):
+        self.poll_seconds = poll_seconds
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.last_id = None
+        self.task = None
+        self.loop = None
+
+    def ensure_polling(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # runserver gives every async request its own loop, ASGI servers share one
+            self.loop = loop
+            self.last_id = None
+            self.task = None
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self.poll())
+
+    async def poll(self):
+        if self.last_id is None:
+            self.last_id = await sync_to_async(latest_event_id)()
+
+        try:
+            while self.subscribers:
+                events = await sync_to_async(events_after)(self.last_id, limit=EVENT_BATCH_SIZE)
+                if events:
+                    self.last_id = events[-1].pk
+                    for queue in list(self.subscribers):
+                        self.publish(queue, events)
+
+                if len(events) < EVENT_BATCH_SIZE:
+                    await asyncio.sleep(self.poll_seconds)
+        finally:
+            # events created while nobody listens are not replayed to the next client
+            self.last_id = None
+
+    def publish(self, queue, events):
+        try:
+            for event in events:
+                queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # a client that cannot keep up is closed, the browser reconnects
+            # with Last-Event-ID and catches up from the table
+            self.subscribers.discard(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    async def stream(self, last_event_id=None, keepalive_seconds=15):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        self.ensure_polling()
+
+        try:
+            # replay what happened since the page was rendered or the client disconnected
+            if last_event_id is not None:
+                for event in await sync_to_async(events_after)(last_event_id, limit=self.queue_size):
+                    last_event_id = event.pk
+                    yield format_event(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event is None:
+                    return
+                if last_event_id is not None and event.pk <= last_event_id:
+                    continue
+                yield format_event(event)
+        finally:
+            self.subscribers.discard(queue)
+
+
+change_feed = ChangeFeed(poll_seconds=settings.CHANGE_FEED_POLL_SECONDS)
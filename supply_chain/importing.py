@@ -0,0 +1,117 @@
+# Parsing and validation of import files, run in the worker processes of import_data.
+# Workers started with spawn or forkserver re-import this module without Django being
+# set up, so nothing here may import models or touch the ORM.
+
+import os
+import time
+
+import pandas as pd
+
+
+SUPPORTED_EXTENSIONS = ['.csv', '.xlsx', '.xls', '.json']
+
+
+def read_data_file(path):
+    # detect file extension and read accordingly
+    file_extension = os.path.splitext(path)[1].lower()
+
+    if file_extension == '.csv':
+        return pd.read_csv(path, encoding='latin1')
+    elif file_extension in ['.xlsx', '.xls']:
+        return pd.read_excel(path, engine='openpyxl' if file_extension == '.xlsx' else None)
+    elif file_extension == '.json':
+        return pd.read_json(path)
+    raise ValueError(f"Unsupported file format: {file_extension}")
+
+
+REQUIRED_COLUMNS = [
+    'Order Id',
+    'Product Card Id',
+    'Product Name',
+    'Category Name',
+    'Customer City',
+    'Customer Country',
+    'order date (DateOrders)',
+]
+
+# order level fields that must agree between the item rows of one order
+ORDER_FIELDS = ['order_date', 'customer_city', 'customer_country']
+
+NAME_MAX_LENGTH = 100  # Supplier.name and Product.name
+
+
+def validate_file(path):
+    """
+    Parse and validate one data file.
+
+    Returns a dict with the normalized rows, the same rows as read from the file
+    (so the writer can quarantine them as received), the rejected rows (with an
+    'error' column) and the parse time. Runs inside the worker processes, so it must not
+    touch the ORM.
+    """
+    started = time.perf_counter()
+    result = {'path': path, 'rows': None, 'source': None, 'rejected': None, 'error': None}
+
+    try:
+        df = read_data_file(path)
+        missing_columns = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+        if missing_columns:
+            raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+    except Exception as e:
+        result.update(error=str(e), seconds=time.perf_counter() - started)
+        return result
+
+    if 'Product Description' in df.columns:
+        descriptions = df['Product Description']
+    else:
+        descriptions = pd.Series(None, index=df.index, dtype=object)
+
+    # coercion, every check below is evaluated on the whole column at once
+    order_ids = pd.to_numeric(df['Order Id'], errors='coerce')
+    product_ids = pd.to_numeric(df['Product Card Id'], errors='coerce')
+    order_dates = pd.to_datetime(df['order date (DateOrders)'], format='%m/%d/%Y %H:%M', errors='coerce')
+    product_names = df['Product Name'].astype(str).str.strip()
+    supplier_names = product_names.str.split(',').str[0].str.strip()
+
+    checks = [
+        ('missing_value', df[REQUIRED_COLUMNS].isna().any(axis=1)),
+        ('invalid_order_id', order_ids.isna() | (order_ids % 1 != 0)),
+        ('invalid_product_id', product_ids.isna() | (product_ids % 1 != 0)),
+        ('invalid_date', order_dates.isna()),
+        ('malformed_product_name', (supplier_names == '') | (product_names.str.len() > NAME_MAX_LENGTH)),
+    ]
+
+    # the first failing check names the error of a row
+    errors = pd.Series(None, index=df.index, dtype=object)
+    for error, failed in reversed(checks):
+        errors = errors.mask(failed, error)
+
+    valid = errors.isna()
+    normalized = pd.DataFrame({
+        'supplier_name': supplier_names[valid],
+        'sku': product_ids[valid].astype('int64').astype(str),
+        'product_name': product_names[valid],
+        'description': descriptions[valid].fillna('No description available'),
+        'category': df.loc[valid, 'Category Name'],
+        'order_id': order_ids[valid].astype('int64'),
+        'customer_city': df.loc[valid, 'Customer City'],
+        'customer_country': df.loc[valid, 'Customer Country'],
+        'order_date': order_dates[valid],
+    })
+
+    # an order spans several rows (one per item), repeats that agree with the first
+    # row are kept as items of that order, repeats that contradict it are duplicates
+    first = normalized.groupby('order_id')[ORDER_FIELDS].transform('first')
+    conflicting = (normalized[ORDER_FIELDS] != first).any(axis=1)
+    errors[conflicting[conflicting].index] = 'duplicate_order_id'
+
+    normalized = normalized[~conflicting]
+    rejected = df[errors.notna()].assign(error=errors[errors.notna()])
+
+    result.update(
+        rows=normalized,
+        source=df.loc[normalized.index],
+        rejected=rejected,
+        seconds=time.perf_counter() - started
+    )
+    return result
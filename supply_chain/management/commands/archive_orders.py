@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from supply_chain.models import Order, ArchivedOrder
+from supply_chain.queries import archive_cutoff
+
+
+ARCHIVED_FIELDS = ['order_id', 'product_id', 'customer_city', 'customer_country', 'order_date', 'status']
+
+
+class Command(BaseCommand):
+    help = 'Move orders older than the archive horizon into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ORDER_ARCHIVE_DAYS,
+            help='Keep orders from this many days before the newest order (defaults to ORDER_ARCHIVE_DAYS)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of orders moved per transaction'
+        )
+
+    def handle(self, *args, **kwargs):
+        newest = Order.objects.aggregate(newest=Max('order_date'))['newest']
+        if newest is None:
+            self.stdout.write("No orders to archive.")
+            return
+
+        cutoff = archive_cutoff(newest, kwargs['days'])
+        batch_size = kwargs['batch_size']
+        self.stdout.write(f"Archiving orders placed before {cutoff:%Y-%m-%d %H:%M}...")
+
+        moved = 0
+        while True:
+            # every batch is copied and deleted in one transaction so an order is
+            # never in both tables or in neither
+            with transaction.atomic():
+                batch = list(
+                    Order.objects.filter(order_date__lt=cutoff)
+                    .order_by('pk')
+                    .values('pk', *ARCHIVED_FIELDS)[:batch_size]
+                )
+                if not batch:
+                    break
+
+                ArchivedOrder.objects.bulk_create(
+                    [ArchivedOrder(**{field: row[field] for field in ARCHIVED_FIELDS}) for row in batch]
+                )
+                Order.objects.filter(pk__in=[row['pk'] for row in batch]).delete()
+
+            moved += len(batch)
+            self.stdout.write(f"  {moved} orders archived...")
+
+        self.stdout.write(self.style.SUCCESS(f'Archiving complete! Moved {moved} orders.'))
@@ -1,107 +1,277 @@
 import pandas as pd
-from django.core.management.base import BaseCommand
-from supply_chain.models import Supplier, Product, Order
-from datetime import datetime
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.conf import settings
+from supply_chain.events import prune_events, record_import
+from supply_chain.importing import ORDER_FIELDS, SUPPORTED_EXTENSIONS, validate_file
+from supply_chain.models import Supplier, Product, Order, ArchivedOrder, ImportJob
+from supply_chain.queries import archive_cutoff
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import os
 import glob
+import time
+
+
+SUPPLIER_DEFAULTS = {
+    'contact_email': 'supplier@example.com',
+    'phone_number': '000-000-0000',
+    'address': '123 Supplier St'
+}
 
 
 class Command(BaseCommand):
-    help = 'Import data from CSV, Excel, or JSON file into the database'
+    help = 'Import data from CSV, Excel, or JSON files into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Data files, directories or glob patterns (defaults to data/DataCoSupplyChainDataset.*)'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Number of processes used to parse files (defaults to the CPU count)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of rows per bulk insert'
+        )
+        parser.add_argument(
+            '--skip-bad-files', action='store_true',
+            help='Import the readable files when some files cannot be read instead of aborting'
+        )
 
     def handle(self, *args, **kwargs):
-        data_dir = 'data'  # data file with any supported extension
-        supported_extensions = ['*.csv', '*.xlsx', '*.xls', '*.json']
-        
-        data_file_path = None
-        for ext in supported_extensions:
-            pattern = os.path.join(data_dir, f'DataCoSupplyChainDataset{ext[1:]}')
-            matches = glob.glob(pattern)
-            if matches:
-                data_file_path = matches[0]
-                break
-        
-        if not data_file_path:
+        data_file_paths = self.find_data_files(kwargs['paths'])
+
+        if not data_file_paths:
             self.stdout.write(self.style.ERROR("No data file found. Please upload a CSV, Excel, or JSON file."))
             return
 
-        file_extension = os.path.splitext(data_file_path)[1].lower()  # detect file extension and read accordingly
-        
-        self.stdout.write(f"Reading {file_extension} file: {data_file_path}")
-        
+        workers = kwargs['workers'] or os.cpu_count() or 1
+        workers = max(1, min(workers, len(data_file_paths)))
+        self.batch_size = kwargs['batch_size']
+        self.skip_bad_files = kwargs['skip_bad_files']
+
+        self.job = ImportJob.objects.create(source_files=data_file_paths)
+        self.stdout.write(
+            f"Starting import job {self.job.pk} of {len(data_file_paths)} file(s) with {workers} worker(s)...")
+
+        # lookups shared by all files so dedupe stays correct across them
+        self.supplier_ids = {}
+        self.product_ids = {}
+        self.first_orders = {}  # order level fields of every created order, by order_id
+        self.newest_order_date = None
+
+        self.error_counts = Counter()
+        self.rejected_frames = []
+
+        started = time.perf_counter()
+
         try:
-            if file_extension == '.csv':
-                df = pd.read_csv(data_file_path, encoding='latin1')
-            elif file_extension in ['.xlsx', '.xls']:
-                df = pd.read_excel(data_file_path, engine='openpyxl' if file_extension == '.xlsx' else None)
-            elif file_extension == '.json':
-                df = pd.read_json(data_file_path)
+            # clearing and writing share one transaction, a failed run leaves the old data in place
+            with transaction.atomic():
+                # old data cleared before importing to prevent create duplicate orders after the scrip run
+                self.stdout.write("Clearing old data from the database...")
+                ArchivedOrder.objects.all().delete()
+                Order.objects.all().delete()
+                Product.objects.all().delete()
+                Supplier.objects.all().delete()
+                self.stdout.write(self.style.SUCCESS("Old data cleared."))
+
+                if workers == 1:
+                    self.write_results(map(validate_file, data_file_paths))
+                else:
+                    with ProcessPoolExecutor(max_workers=workers) as executor:
+                        # files are parsed in parallel, results come back in input order so
+                        # the first occurrence of an order always wins
+                        futures = [executor.submit(validate_file, path) for path in data_file_paths]
+                        self.write_results(future.result() for future in futures)
+
+                # raising here rolls back the clearing above
+                if not self.first_orders:
+                    raise CommandError("No valid rows found, nothing was imported.")
+        except Exception:
+            self.write_quarantine()
+            self.job.status = 'failed'
+            self.job.finished_at = timezone.now()
+            self.job.error_counts = dict(self.error_counts)
+            self.job.save()
+            raise
+
+        self.finish_job()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Data import complete! Created {len(self.first_orders)} unique orders in {elapsed:.2f}s.'))
+
+    def find_data_files(self, paths):
+        if not paths:
+            # data file with any supported extension
+            for ext in SUPPORTED_EXTENSIONS:
+                matches = glob.glob(os.path.join('data', f'DataCoSupplyChainDataset{ext}'))
+                if matches:
+                    return matches[:1]
+            return []
+
+        found = []
+        for path in paths:
+            if os.path.isdir(path):
+                matches = [os.path.join(path, name) for name in os.listdir(path)]
             else:
-                self.stdout.write(self.style.ERROR(f"Unsupported file format: {file_extension}"))
-                return
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error reading file: {e}"))
-            return
+                matches = glob.glob(path)
+
+            for match in sorted(matches):
+                if os.path.isfile(match) and os.path.splitext(match)[1].lower() in SUPPORTED_EXTENSIONS:
+                    if match not in found:
+                        found.append(match)
+        return found
+
+    def write_results(self, results):
+        # single writer: every validated batch funnels through here
+        for result in results:
+            path = result['path']
+            if result['error']:
+                self.error_counts['unreadable_file'] += 1
+                self.stdout.write(self.style.ERROR(f"{path}: could not be read. Error: {result['error']}"))
+                if not self.skip_bad_files:
+                    raise CommandError(f"{path} could not be read, nothing was imported. Error: {result['error']}")
+                continue
+
+            self.job.rows_total += len(result['rows']) + len(result['rejected'])
 
-        # old data cleared before importing to prevent create duplicate orders after the scrip run
-        self.stdout.write("Clearing old data from the database...")
-        Order.objects.all().delete()
-        Product.objects.all().delete()
-        Supplier.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS("Old data cleared."))
-
-        self.stdout.write("Starting data import...")
-
-        # a set to keep track of order IDs
-        processed_order_ids = set()
-
-        # iterates over each row in the DataFrame
-        for index, row in df.iterrows():
-
-            # Create or get the Supplier
-            supplier_name = row['Product Name'].split(',')[0]
-            supplier, created = Supplier.objects.get_or_create(
-                name=supplier_name,
-                defaults={
-                    'contact_email': 'supplier@example.com',
-                    'phone_number': '000-000-0000',
-                    'address': '123 Supplier St'
-                }
+            write_started = time.perf_counter()
+            created, duplicates = self.write_batch(result['rows'])
+            write_seconds = time.perf_counter() - write_started
+
+            rejected = result['rejected']
+            if not duplicates.empty:
+                source_rows = result['source'].loc[duplicates.index]
+                rejected = pd.concat([rejected, source_rows.assign(error='duplicate_order_id')])
+            if not rejected.empty:
+                self.error_counts.update(rejected['error'].value_counts().to_dict())
+                self.rejected_frames.append(rejected.assign(source_file=path, row_index=rejected.index))
+
+            self.stdout.write(
+                f"{path}: {created} orders created, {len(rejected)} rows rejected "
+                f"(parse {result['seconds']:.2f}s, write {write_seconds:.2f}s)"
             )
 
-            # Create or get the Product
-            product, created = Product.objects.get_or_create(
-                sku=row['Product Card Id'],
-                defaults={
-                    'name': row['Product Name'],
-                    'description': row['Product Description'] if pd.notna(
-                        row['Product Description']) else 'No description available',
-                    'category': row['Category Name'],
-                    'supplier': supplier
-                }
+    def write_quarantine(self):
+        if not self.rejected_frames:
+            return
+
+        job = self.job
+        quarantine_dir = settings.IMPORT_QUARANTINE_DIR
+        os.makedirs(quarantine_dir, exist_ok=True)
+        job.quarantine_file = str(os.path.join(quarantine_dir, f'job_{job.pk}_quarantine.csv'))
+
+        rejected = pd.concat(self.rejected_frames, ignore_index=True)
+        leading = ['source_file', 'row_index', 'error']
+        rejected = rejected[leading + [column for column in rejected.columns if column not in leading]]
+        rejected.to_csv(job.quarantine_file, index=False)
+
+    def finish_job(self):
+        job = self.job
+        self.write_quarantine()
+
+        job.status = 'completed'
+        job.finished_at = timezone.now()
+        job.orders_created = len(self.first_orders)
+        job.rows_rejected = sum(count for error, count in self.error_counts.items() if error != 'unreadable_file')
+        job.error_counts = dict(self.error_counts)
+        job.save()
+
+        # the cutoff moves forward as newer files come in, archive what fell behind it
+        call_command('archive_orders', stdout=self.stdout)
+
+        # push the new totals to open dashboards and boards
+        prune_events()
+        record_import()
+
+        call_command('refresh_scorecards', stdout=self.stdout)
+
+        if self.error_counts:
+            self.stdout.write(self.style.WARNING("Data quality report:"))
+            for error, count in self.error_counts.most_common():
+                self.stdout.write(f"  {error}: {count}")
+            if job.quarantine_file:
+                self.stdout.write(f"Rejected rows written to {job.quarantine_file}")
+
+    def write_batch(self, df):
+        # suppliers and products come from every item row, orders only from the first row per order
+
+        # same rule as within a file: a repeat of an order from an earlier file is an item of
+        # that order if it agrees with it and a duplicate if not, duplicates write nothing
+        # lookups go row by row through the dicts so the cost follows the batch size, not the
+        # number of orders imported so far
+        known = df['order_id'].map(self.first_orders.get)
+        seen = known.notna()
+        conflicting = pd.Series(False, index=df.index)
+        if seen.any():
+            first = pd.DataFrame(known[seen].tolist(), index=known[seen].index, columns=ORDER_FIELDS)
+            conflicting[seen] = (df.loc[seen, ORDER_FIELDS] != first).any(axis=1)
+        duplicates = df[conflicting]
+        df = df[~conflicting]
+        seen = seen[~conflicting]
+
+        # create suppliers not seen in earlier files
+        new_suppliers = [name for name in df['supplier_name'].unique() if name not in self.supplier_ids]
+        if new_suppliers:
+            suppliers = Supplier.objects.bulk_create(
+                [Supplier(name=name, **SUPPLIER_DEFAULTS) for name in new_suppliers],
+                batch_size=self.batch_size
             )
+            self.supplier_ids.update((supplier.name, supplier.pk) for supplier in suppliers)
 
-            # Create the Order
-            order_id = row['Order Id']
-
-            # to check if this order have already processed in the loop
-            if order_id not in processed_order_ids:
-                try:
-                    # convert the date string from the CSV into a Python datetime object
-                    order_date_obj = datetime.strptime(row['order date (DateOrders)'], '%m/%d/%Y %H:%M')
-
-                    Order.objects.create(
-                        order_id=order_id,
-                        product=product,
-                        customer_city=row['Customer City'],
-                        customer_country=row['Customer Country'],
-                        order_date=order_date_obj
+        # create products not seen in earlier files, first row per sku wins
+        products = df.drop_duplicates(subset='sku', keep='first')
+        products = products[~products['sku'].map(self.product_ids.__contains__).astype(bool)]
+        if not products.empty:
+            created_products = Product.objects.bulk_create(
+                [
+                    Product(
+                        sku=row.sku,
+                        name=row.product_name,
+                        description=row.description,
+                        category=row.category,
+                        supplier_id=self.supplier_ids[row.supplier_name],
                     )
-                    # the ID to the set to not create it again added
-                    processed_order_ids.add(order_id)
+                    for row in products.itertuples(index=False)
+                ],
+                batch_size=self.batch_size
+            )
+            self.product_ids.update((product.sku, product.pk) for product in created_products)
 
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f"Could not process Order ID {order_id}. Error: {e}"))
+        # create orders not seen in earlier files
+        orders = df[~seen].drop_duplicates(subset='order_id', keep='first')
+        if orders.empty:
+            return 0, duplicates
+        order_dates = orders['order_date'].dt.tz_localize(timezone.get_default_timezone())
 
-        self.stdout.write(
-            self.style.SUCCESS(f'Data import complete! Created {len(processed_order_ids)} unique orders.'))
\ No newline at end of file
+        # orders already past the archive horizon of the newest order seen so far go straight
+        # to the archive table, archive_orders moves the rest once the last file is in
+        newest = order_dates.max().to_pydatetime()
+        if self.newest_order_date is None or newest > self.newest_order_date:
+            self.newest_order_date = newest
+        archived = order_dates < archive_cutoff(self.newest_order_date)
+
+        for model, selected in ((ArchivedOrder, archived), (Order, ~archived)):
+            model.objects.bulk_create(
+                [
+                    model(
+                        order_id=row.order_id,
+                        product_id=self.product_ids[row.sku],
+                        customer_city=row.customer_city,
+                        customer_country=row.customer_country,
+                        order_date=order_date.to_pydatetime(),
+                    )
+                    for row, order_date in zip(orders[selected].itertuples(index=False), order_dates[selected])
+                ],
+                batch_size=self.batch_size
+            )
+        self.first_orders.update(zip(orders['order_id'], zip(*(orders[field] for field in ORDER_FIELDS))))
+
+        return len(orders), duplicates
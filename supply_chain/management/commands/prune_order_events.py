@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from supply_chain.events import prune_events
+
+
+class Command(BaseCommand):
+    help = 'Delete order events older than the change feed retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=settings.CHANGE_FEED_RETENTION_HOURS,
+            help='Keep events from this many hours (defaults to CHANGE_FEED_RETENTION_HOURS)'
+        )
+
+    def handle(self, *args, **kwargs):
+        deleted = prune_events(kwargs['hours'])
+        self.stdout.write(self.style.SUCCESS(f'Pruning complete! Deleted {deleted} order events.'))
@@ -0,0 +1,101 @@
+import pandas as pd
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Min, Max
+from django.utils import timezone
+from supply_chain.models import Supplier, Order, ArchivedOrder, SupplierScorecard
+
+
+STAT_FIELDS = ['order_count', 'active_days', 'avg_orders_per_day', 'reliability_score']
+
+
+def supplier_order_stats(model):
+    # one grouped query per table instead of one query per supplier
+    return pd.DataFrame(list(
+        model.objects.values(supplier_name=F('product__supplier__name'))
+        .annotate(order_count=Count('id'), first_order=Min('order_date'), last_order=Max('order_date'))
+        .order_by()
+    ), columns=['supplier_name', 'order_count', 'first_order', 'last_order'])
+
+
+def compute_scorecards():
+    """Scorecard stats of every supplier from recent and archived orders."""
+    stats = pd.concat([supplier_order_stats(Order), supplier_order_stats(ArchivedOrder)])
+    stats = stats.groupby('supplier_name').agg(
+        order_count=('order_count', 'sum'),
+        first_order=('first_order', 'min'),
+        last_order=('last_order', 'max'),
+    )
+
+    # suppliers without any order still get a (zero) scorecard
+    # explicit dtype, an empty supplier list would otherwise come out as float64 and fail the join
+    suppliers = pd.DataFrame({
+        'supplier_name': pd.Series(list(Supplier.objects.values_list('name', flat=True).distinct()), dtype=object)
+    })
+    df = suppliers.join(stats, on='supplier_name')
+    df['order_count'] = df['order_count'].fillna(0).astype(int)
+
+    first_order = pd.to_datetime(df['first_order'], utc=True)
+    last_order = pd.to_datetime(df['last_order'], utc=True)
+    date_range = (last_order - first_order).dt.days
+    df['active_days'] = date_range.clip(lower=1).where(df['order_count'] > 0, 0).fillna(0).astype(int)
+
+    # Calculate average orders per day
+    df['avg_orders_per_day'] = (df['order_count'] / df['active_days'].clip(lower=1)).where(df['order_count'] > 0, 0.0)
+
+    # Reliability score: combination of volume and consistency
+    # Higher order count and consistent delivery = higher score
+    volume_score = (df['order_count'] / 10).clip(upper=50)  # Max 50 points for volume
+    consistency_score = (df['avg_orders_per_day'] * 100).clip(upper=50)  # Max 50 points for consistency
+    df['reliability_score'] = (volume_score + consistency_score).clip(upper=100)
+
+    df['avg_orders_per_day'] = df['avg_orders_per_day'].round(2)
+    df['reliability_score'] = df['reliability_score'].round(1)
+    return df[['supplier_name'] + STAT_FIELDS]
+
+
+class Command(BaseCommand):
+    help = 'Store the daily scorecard snapshot of every supplier'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date', type=date.fromisoformat, default=None,
+            help='Snapshot date as YYYY-MM-DD (defaults to today)'
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help="Rewrite every supplier's snapshot, not only those that differ from the one already stored for the date"
+        )
+
+    def handle(self, *args, **kwargs):
+        snapshot_date = kwargs['date'] or timezone.localdate()
+        scorecards = compute_scorecards()
+
+        if not kwargs['full']:
+            # every supplier gets a row per day, incremental runs (several imports a day)
+            # only rewrite the rows of that day whose figures changed
+            stored = pd.DataFrame(
+                list(SupplierScorecard.objects.filter(date=snapshot_date).values('supplier_name', *STAT_FIELDS)),
+                columns=['supplier_name'] + STAT_FIELDS
+            )
+            merged = scorecards.merge(stored, on='supplier_name', how='left', suffixes=('', '_stored'))
+            unchanged = pd.Series(True, index=merged.index)
+            for field in STAT_FIELDS:
+                unchanged &= merged[field] == merged[f'{field}_stored']
+            scorecards = scorecards[~unchanged.to_numpy()]
+
+        SupplierScorecard.objects.bulk_create(
+            [
+                SupplierScorecard(supplier_name=row.supplier_name, date=snapshot_date, **{
+                    field: getattr(row, field) for field in STAT_FIELDS
+                })
+                for row in scorecards.itertuples(index=False)
+            ],
+            batch_size=5000,
+            update_conflicts=True,
+            unique_fields=['supplier_name', 'date'],
+            update_fields=STAT_FIELDS,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Scorecards refreshed! Stored {len(scorecards)} snapshots for {snapshot_date}.'))
@@ -22,7 +22,7 @@ class Product(models.Model):
         return self.name
 
 
-class Order(models.Model):
+class AbstractOrder(models.Model):
     order_id = models.IntegerField(unique=True)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     customer_city = models.CharField(max_length=100)
@@ -35,5 +35,97 @@ class Order(models.Model):
         ('delivered', 'Delivered'),
     ], default='pending')
 
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"Order {self.order_id}"
+
+
+class Order(AbstractOrder):
+    # recent orders only, older ones are moved to ArchivedOrder by archive_orders
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-order_date']),
+            models.Index(fields=['order_date']),
+        ]
+
+
+class ArchivedOrder(AbstractOrder):
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order_date']),
+        ]
+
+
+class ImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    source_files = models.JSONField(default=list)
+    rows_total = models.IntegerField(default=0)
+    rows_rejected = models.IntegerField(default=0)
+    orders_created = models.IntegerField(default=0)
+    error_counts = models.JSONField(default=dict)  # rejected rows by error type
+    quarantine_file = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        return f"Import {self.pk} ({self.status})"
+
+
+class OrderEvent(models.Model):
+    # change feed read by the live update stream, one row per change
+    KIND_CHOICES = [
+        ('status', 'Status Change'),
+        ('import', 'Import'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    order_id = models.IntegerField(null=True, blank=True)
+    old_status = models.CharField(max_length=20, blank=True)
+    new_status = models.CharField(max_length=20, blank=True)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def as_message(self):
+        if self.kind == 'status':
+            return {
+                'order_id': self.order_id,
+                'old_status': self.old_status,
+                'new_status': self.new_status,
+            }
+        return self.payload
+
+    def __str__(self):
+        return f"{self.kind} event {self.pk}"
+
+
+class SupplierScorecard(models.Model):
+    # keyed by name rather than a foreign key so the history survives re-imports,
+    # which recreate every supplier
+    supplier_name = models.CharField(max_length=100)
+    date = models.DateField()
+    order_count = models.IntegerField(default=0)
+    active_days = models.IntegerField(default=0)
+    avg_orders_per_day = models.FloatField(default=0)
+    reliability_score = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['supplier_name', 'date'], name='unique_supplier_scorecard_per_day'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
     def __str__(self):
-        return f"Order {self.order_id}"
\ No newline at end of file
+        return f"{self.supplier_name} on {self.date}"
@@ -0,0 +1,39 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from .models import Supplier, Order, ArchivedOrder, SupplierScorecard
+
+
+def order_values(*fields, include_archive=False, **filters):
+    """
+    Values of the orders matching ``filters``.
+
+    Only recent orders are read unless ``include_archive`` is set, in which case
+    archived orders are added with a UNION ALL so callers see the full history.
+    """
+    orders = Order.objects.filter(**filters).values(*fields)
+    if not include_archive:
+        return orders
+
+    archived = ArchivedOrder.objects.filter(**filters).values(*fields)
+    return orders.union(archived, all=True)
+
+
+
+def archive_cutoff(newest_order_date, days=None):
+    """Orders placed before this belong in the archive, ``days`` defaults to ORDER_ARCHIVE_DAYS."""
+    days = settings.ORDER_ARCHIVE_DAYS if days is None else days
+    return newest_order_date - timedelta(days=days)
+
+
+def latest_scorecards():
+    """Most recent scorecard snapshot of every current supplier."""
+    latest_date = (
+        SupplierScorecard.objects.filter(supplier_name=OuterRef('supplier_name'))
+        .order_by('-date')
+        .values('date')[:1]
+    )
+    return SupplierScorecard.objects.filter(
+        supplier_name__in=Supplier.objects.values('name'),
+        date=Subquery(latest_date),
+    )
@@ -0,0 +1,80 @@
+import os
+import tempfile
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from supply_chain.importing import validate_file
+
+
+def make_row(**overrides):
+    row = {
+        'Order Id': 1,
+        'Product Card Id': 100,
+        'Product Name': 'Acme, Widget',
+        'Product Description': 'A widget',
+        'Category Name': 'Tools',
+        'Customer City': 'Caguas',
+        'Customer Country': 'Puerto Rico',
+        'order date (DateOrders)': '1/31/2018 22:56',
+    }
+    row.update(overrides)
+    return row
+
+
+class ValidateFileTests(SimpleTestCase):
+    def validate(self, rows):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'orders.csv')
+            pd.DataFrame(rows).to_csv(path, index=False)
+            return validate_file(path)
+
+    def errors(self, result):
+        return result['rejected']['error'].tolist()
+
+    def test_coerces_ids_and_dates(self):
+        result = self.validate([
+            make_row(**{'Order Id': '12', 'Product Card Id': '100.0'}),
+            make_row(**{'Order Id': '12.5'}),
+            make_row(**{'Order Id': 13, 'Product Card Id': 'abc'}),
+            make_row(**{'Order Id': 14, 'order date (DateOrders)': '2018-01-31'}),
+        ])
+
+        row = result['rows'].iloc[0]
+        self.assertEqual(row['order_id'], 12)
+        self.assertEqual(row['sku'], '100')
+        self.assertEqual(row['order_date'], pd.Timestamp(2018, 1, 31, 22, 56))
+        self.assertEqual(row['supplier_name'], 'Acme')
+        self.assertEqual(self.errors(result), ['invalid_order_id', 'invalid_product_id', 'invalid_date'])
+
+    def test_first_failing_check_names_the_error(self):
+        result = self.validate([
+            make_row(**{'Order Id': 'x', 'Customer City': None, 'order date (DateOrders)': 'bad'}),
+            make_row(**{'Order Id': 'x', 'order date (DateOrders)': 'bad'}),
+            make_row(**{'Order Id': 3, 'order date (DateOrders)': 'bad', 'Product Name': ', Widget'}),
+            make_row(**{'Order Id': 4, 'Product Name': ', Widget'}),
+        ])
+
+        self.assertTrue(result['rows'].empty)
+        self.assertEqual(
+            self.errors(result),
+            ['missing_value', 'invalid_order_id', 'invalid_date', 'malformed_product_name']
+        )
+
+    def test_item_repeats_are_kept_and_conflicting_repeats_rejected(self):
+        result = self.validate([
+            make_row(),
+            make_row(**{'Product Card Id': 200, 'Product Name': 'Beta, Gadget'}),
+            make_row(**{'Product Card Id': 300, 'Customer City': 'Ponce'}),
+        ])
+
+        self.assertEqual(result['rows']['sku'].tolist(), ['100', '200'])
+        self.assertEqual(self.errors(result), ['duplicate_order_id'])
+        self.assertEqual(result['rejected'].index.tolist(), [2])
+        self.assertEqual(result['source'].index.tolist(), [0, 1])
+
+    def test_missing_columns_are_reported_not_raised(self):
+        result = self.validate([{'Order Id': 1}])
+
+        self.assertIsNone(result['rows'])
+        self.assertIn('Missing columns', result['error'])
@@ -10,4 +10,5 @@ urlpatterns = [
     path('suppliers/', views.supplier_analytics_view, name='supplier-analytics'),
     path('kanban/', views.kanban_view, name='kanban'),
     path('kanban/update-status/', views.update_order_status, name='update-order-status'),
+    path('events/', views.order_events_view, name='order-events'),
 ]
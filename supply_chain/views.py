@@ -1,9 +1,12 @@
 # supply_chain/views.py
 
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Product, Supplier, Order
+from .models import Product, Supplier, Order, SupplierScorecard
+from .queries import order_values, latest_scorecards
+from .events import change_feed, record_status_change
 import plotly.express as px
 import pandas as pd
+from django.db import transaction
 from django.db.models import Q
 from django.core.management import call_command
 from django.core.files.storage import FileSystemStorage
@@ -13,7 +16,8 @@ from prophet import Prophet
 import plotly.graph_objs as go
 import folium
 from django.contrib import messages
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
@@ -123,7 +127,8 @@ def upload_data_view(request):
 
 
 def forecast_view(request):
-    orders = Order.objects.all().values('order_date')
+    # forecasting needs the full history, archived orders included
+    orders = order_values('order_date', include_archive=True)
     df = pd.DataFrame(list(orders))
 
     if not df.empty:
@@ -218,57 +223,30 @@ def map_view(request):
 
 
 def supplier_analytics_view(request):  # Supplier Performance Analytics with scorecards and charts
-    suppliers = Supplier.objects.all()
-    
-    if not suppliers.exists():
+    # existing installs may have suppliers but no snapshot yet, take the first one now
+    if not latest_scorecards().exists() and Supplier.objects.exists():
+        call_command('refresh_scorecards')
+
+    if not latest_scorecards().exists():
         context = {
             'no_data': True,
             'top_chart_html': "<p class='text-center text-muted'>No supplier data available</p>",
             'bottom_chart_html': "<p class='text-center text-muted'>No supplier data available</p>",
+            'trend_chart_html': "<p class='text-center text-muted'>No supplier data available</p>",
             'supplier_scores': []
         }
         return render(request, 'supply_chain/supplier_analytics.html', context)
     
-    # Calculate performance metrics for each supplier
-    supplier_data = []
-    
-    for supplier in suppliers:
-        orders = Order.objects.filter(product__supplier=supplier)
-        order_count = orders.count()
-        
-        # Calculate reliability score (0-100), based on order volume and consistency
-        if order_count > 0:
-            orders_with_dates = orders.values('order_date')
-            if orders_with_dates:
-                df_orders = pd.DataFrame(list(orders_with_dates))
-                df_orders['order_date'] = pd.to_datetime(df_orders['order_date']).dt.tz_localize(None)
-                
-                date_range = (df_orders['order_date'].max() - df_orders['order_date'].min()).days
-                active_days = max(date_range, 1)
-                
-                # Calculate average orders per day
-                avg_orders_per_day = order_count / active_days
-                
-                # Reliability score: combination of volume and consistency
-                # Higher order count and consistent delivery = higher score
-                volume_score = min(order_count / 10, 50)  # Max 50 points for volume
-                consistency_score = min(avg_orders_per_day * 100, 50)  # Max 50 points for consistency
-                reliability_score = min(volume_score + consistency_score, 100)
-            else:
-                reliability_score = 0
-        else:
-            reliability_score = 0
-            avg_orders_per_day = 0
-        
-        supplier_data.append({
-            'name': supplier.name,
-            'order_count': order_count,
-            'reliability_score': round(reliability_score, 1),
-            'avg_orders_per_day': round(avg_orders_per_day, 2)
-        })
-    
-    # By order count
-    supplier_data.sort(key=lambda x: x['order_count'], reverse=True)
+    # Scores are precomputed by the refresh_scorecards command, read the latest snapshot
+    supplier_data = [
+        {
+            'name': scorecard.supplier_name,
+            'order_count': scorecard.order_count,
+            'reliability_score': scorecard.reliability_score,
+            'avg_orders_per_day': scorecard.avg_orders_per_day
+        }
+        for scorecard in latest_scorecards().order_by('-order_count', 'supplier_name')
+    ]
     
     # Top 5 and bottom 5
     top_5 = supplier_data[:5]
@@ -332,10 +310,41 @@ def supplier_analytics_view(request):  # Supplier Performance Analytics with sco
     else:
         bottom_chart_html = "<p class='text-center text-muted'>Not enough suppliers for comparison</p>"
     
+    # Reliability trend of the top 5 suppliers from the snapshot history
+    history = SupplierScorecard.objects.filter(
+        supplier_name__in=[supplier['name'] for supplier in top_5]
+    ).order_by('date').values('supplier_name', 'date', 'reliability_score')
+    df_history = pd.DataFrame(list(history))
+    
+    if df_history['date'].nunique() > 1:
+        fig_trend = px.line(
+            df_history,
+            x='date',
+            y='reliability_score',
+            color='supplier_name',
+            title='Reliability Score Trend (Top 5 Suppliers)',
+            labels={'date': 'Date', 'reliability_score': 'Reliability Score', 'supplier_name': 'Supplier'},
+            markers=True
+        )
+        
+        fig_trend.update_layout(
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            font=dict(color="#eaeaea"),
+            title_x=0.5,
+            xaxis_title='Date',
+            yaxis_title='Reliability Score'
+        )
+        
+        trend_chart_html = fig_trend.to_html(full_html=False, include_plotlyjs='cdn')
+    else:
+        trend_chart_html = "<p class='text-center text-muted'>Not enough snapshots for a trend yet</p>"
+    
     context = {
         'no_data': False,
         'top_chart_html': top_chart_html,
         'bottom_chart_html': bottom_chart_html,
+        'trend_chart_html': trend_chart_html,
         'supplier_scores': supplier_data,
         'total_suppliers': len(supplier_data)
     }
@@ -387,10 +396,20 @@ def update_order_status(request):
         if new_status not in valid_statuses:
             return JsonResponse({'success': False, 'error': 'Invalid status'}, status=400)
         
-        # Update order
-        order = get_object_or_404(Order, order_id=order_id)
-        order.status = new_status
-        order.save()
+        # Update order, the row is locked and only changes if nobody moved it since it was read,
+        # so the recorded old_status is always the one that was replaced
+        with transaction.atomic():
+            order = get_object_or_404(Order.objects.select_for_update(), order_id=order_id)
+            old_status = order.status
+
+            if old_status != new_status:
+                updated = Order.objects.filter(pk=order.pk, status=old_status).update(status=new_status)
+                if not updated:
+                    return JsonResponse({'success': False, 'error': 'Order was moved by someone else, please retry'}, status=409)
+
+                # let the other open boards know
+                order.status = new_status
+                record_status_change(order, old_status)
         
         return JsonResponse({
             'success': True,
@@ -400,3 +419,16 @@ def update_order_status(request):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+
+async def order_events_view(request):  # Server-sent events stream for live kanban and dashboard updates
+    if not isinstance(request, ASGIRequest):
+        # WSGI would buffer the endless stream and hold the thread, 204 tells EventSource to stop retrying
+        return HttpResponse(status=204)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    response = StreamingHttpResponse(change_feed.stream(last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # keep proxies from buffering the stream
+    return response